@@ -0,0 +1,79 @@
+import argparse
+import os
+import pytest
+import Args
+
+
+def test_str_to_bool_true_values():
+    for value in ('True', 'true', ' T ', 'yes', 'Y', '1'):
+        assert Args.str_to_bool(value) is True
+
+
+def test_str_to_bool_false_values():
+    for value in ('False', 'false', ' F ', 'no', 'N', '0'):
+        assert Args.str_to_bool(value) is False
+
+
+def test_str_to_bool_invalid_value():
+    with pytest.raises(argparse.ArgumentTypeError):
+        Args.str_to_bool('maybe')
+
+
+def test_parse_args_filter_false_string():
+    args = Args.parse_args(['-i', 'in', '-o', 'out', '-p', 'False', '-f', 'False'])
+    assert args.filter is False
+    assert args.plots is False
+
+
+def test_parse_args_filter_default():
+    args = Args.parse_args(['-i', 'in', '-o', 'out', '-p', 'True'])
+    assert args.filter is False
+    assert args.plots is True
+
+
+def test_parse_args_invalid_plots_exits():
+    with pytest.raises(SystemExit):
+        Args.parse_args(['-i', 'in', '-o', 'out', '-p', 'maybe'])
+
+
+def test_parse_args_empty_states():
+    args = Args.parse_args(['-i', 'in', '-o', 'out', '-p', 'False', '-s'])
+    assert args.states is None
+
+
+def test_parse_args_states():
+    args = Args.parse_args(['-i', 'in', '-o', 'out', '-p', 'False', '-s', 'VA', 'DE'])
+    assert args.states == ['VA', 'DE']
+
+
+def test_source_paths_default():
+    zip_path, csv_path = Args.source_paths('in', Args.INST_NAME)
+    assert zip_path == os.path.join('in', '2012_to_2014_institutions_data.zip')
+    assert csv_path == Args.DIR_LOC + '2012_to_2014_institutions_data.csv'
+
+
+def test_source_paths_csv_dir_without_trailing_slash():
+    _, csv_path = Args.source_paths('in', 'loans', 'foo')
+    assert csv_path == 'foo/loans.csv'
+
+
+def test_source_paths_archive_root():
+    _, csv_path = Args.source_paths('in', 'loans', '')
+    assert csv_path == 'loans.csv'
+
+
+def test_parse_args_archive_overrides():
+    args = Args.parse_args(['-i', 'in', '-o', 'out', '-p', 'False', '--institutions', '2015_inst',
+                            '--loans', '2015_loans', '--csv-dir', 'data'])
+    assert args.inst_zip == os.path.join('in', '2015_inst.zip')
+    assert args.inst_file == 'data/2015_inst.csv'
+    assert args.loans_zip == os.path.join('in', '2015_loans.zip')
+    assert args.loans_file == 'data/2015_loans.csv'
+
+
+def test_parse_args_archive_defaults():
+    args = Args.parse_args(['-i', 'in', '-o', 'out', '-p', 'False'])
+    assert args.inst_zip == os.path.join('in', '2012_to_2014_institutions_data.zip')
+    assert args.inst_file == Args.DIR_LOC + '2012_to_2014_institutions_data.csv'
+    assert args.loans_zip == os.path.join('in', '2012_to_2014_loans_data.zip')
+    assert args.loans_file == Args.DIR_LOC + '2012_to_2014_loans_data.csv'